@@ -0,0 +1,24 @@
+"""
+Optional Numba import.
+
+Exposes njit from Numba when it is installed. When Numba is missing the
+decorator degrades to a no-op so the strategy loop still runs as plain
+Python, just without the compiled speedup.
+"""
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """
+        No-op stand-in for numba.njit.
+
+        Returns the decorated function unchanged, supporting both the bare
+        @njit form and the parameterized @njit(cache=True) form.
+        """
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
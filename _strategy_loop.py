@@ -0,0 +1,309 @@
+"""
+Compiled bar-by-bar strategy loops.
+
+The cash and position sizing in next_open is path-dependent (each trade
+size depends on the cash left by the previous trade), which blocks a pure
+NumPy rewrite. These functions port the next_open branch tree to tight
+scalar loops over NumPy arrays and compile them with Numba, removing the
+per-bar Python dispatch and attribute lookups. Without Numba installed
+they fall back to plain Python (see _njit.py).
+
+One deliberate divergence from next_open: on a long<->short flip the
+kernels size the reopened leg from the cash left after crediting the
+close, whereas next_open fixes size = int(getcash() / open) before any
+fill executes - while all-in long that getcash() is a tiny remainder
+(the flip opens a near-zero short), and while short it is inflated by
+the short-sale proceeds (the close executes but the oversized re-buy is
+margin-rejected, leaving the account flat to enter long on the next
+positive bar). The kernels keep the sensible intent instead, so equity
+curves diverge from a Cerebro run on any flip.
+"""
+
+import numpy as np
+
+from _njit import njit
+
+# Column layout of the packed (N, 3) bar tensor
+PRED, OPEN, CLOSE = 0, 1, 2
+
+
+def pack_bars(df):
+    """
+    Pack predicted/open/close into one contiguous (N, 3) float64 array.
+
+    Backtrader keeps each line in its own list-backed buffer, so reading
+    the three values of a bar touches three unrelated allocations. In the
+    packed layout the loads of one bar share a cache line, and the
+    contiguous typing lets the compiled loops auto-vectorize.
+
+    Parameters:
+        - df (pd.DataFrame): Data with 'predicted', 'open' and 'close' columns.
+
+    Returns:
+        - float64[:, ::1]: C-contiguous array indexed [bar, {PRED, OPEN, CLOSE}].
+    """
+    return np.column_stack([
+        df['predicted'].to_numpy(dtype=np.float64),
+        df['open'].to_numpy(dtype=np.float64),
+        df['close'].to_numpy(dtype=np.float64),
+    ]).astype(np.float64, order='C')
+
+
+def signal_targets(pred, allow_short=True):
+    """
+    Precompute the target position and transition mask for a prediction
+    series.
+
+    next_open only ever acts on the sign of the prediction, and only when
+    it is strictly opposite to the current position, so the whole decision
+    tree can be collapsed up front: forward-fill the nonzero signs (a zero
+    prediction holds the current position, exactly as next_open does) and
+    keep just the indices where the target changes. The execution loop
+    then touches O(K) transitions instead of branching on all N bars.
+
+    Parameters:
+        - pred (float64[:]): Machine learning predictions.
+        - allow_short (bool): Allow -1 targets; False clamps to long-only.
+
+    Returns:
+        - (target, transitions): int8 target position in {-1, 0, +1} per
+          bar and the int64 indices where it changes.
+    """
+    sign = np.sign(pred).astype(np.int8)
+
+    # Forward-fill the last nonzero sign so zero predictions hold
+    last = np.maximum.accumulate(np.where(sign != 0, np.arange(sign.size), -1))
+    target = np.where(last >= 0, sign[np.maximum(last, 0)], 0).astype(np.int8)
+
+    if not allow_short:
+        target = np.maximum(target, 0).astype(np.int8)
+
+    transitions = np.flatnonzero(np.diff(target, prepend=np.int8(0)))
+    return target, transitions
+
+
+@njit(cache=True)
+def run_transitions(target, transitions, bars, cash0, commission):
+    """
+    Replay precomputed position targets over their transition indices.
+
+    The branchy per-bar decision logic runs only at the K regime changes;
+    between transitions the position is constant, so the equity curve is
+    filled with a straight multiply-add sweep. Handles both the long-only
+    and the long/short variants, since a long-only target array simply
+    never contains -1. Flips size the reopened leg from post-close cash,
+    not the pre-fill getcash() of next_open (see the module docstring).
+
+    Parameters:
+        - target (int8[:]): Target position in {-1, 0, +1} per bar.
+        - transitions (int64[:]): Indices where the target changes.
+        - bars (float64[:, ::1]): Packed bar tensor from pack_bars.
+        - cash0 (float): Starting cash.
+        - commission (float): Commission rate per trade value.
+
+    Returns:
+        - (equity_curve, pos_curve, trade_pnl): Per-bar mark-to-market
+          equity, signed position size and realized trade PnL (nonzero on
+          the bars where a position is closed).
+    """
+    n = len(target)
+    equity_curve = np.empty(n, dtype=np.float64)
+    pos_curve = np.empty(n, dtype=np.int64)
+    trade_pnl = np.zeros(n, dtype=np.float64)
+
+    cash = cash0
+    size = 0
+    entry_price = 0.0
+    prev = 0
+
+    for k in range(len(transitions)):
+        idx = transitions[k]
+
+        # The state is constant since the last trade: plain fill sweep
+        for i in range(prev, idx):
+            pos_curve[i] = size
+            equity_curve[i] = cash + size * bars[i, CLOSE]
+
+        op = bars[idx, OPEN]
+        if size > 0:
+            # Close the long position at the open
+            proceeds = size * op
+            cash += proceeds - proceeds * commission
+            trade_pnl[idx] = size * (op - entry_price)
+            size = 0
+        elif size < 0:
+            # Close the short position at the open
+            cost = -size * op
+            cash -= cost + cost * commission
+            trade_pnl[idx] = -size * (entry_price - op)
+            size = 0
+
+        t = target[idx]
+        if t > 0:
+            # Open a long position
+            size = int(cash / op)
+            cost = size * op
+            cash -= cost + cost * commission
+            entry_price = op
+        elif t < 0:
+            # Open a short position
+            size = -int(cash / op)
+            proceeds = -size * op
+            cash += proceeds - proceeds * commission
+            entry_price = op
+
+        prev = idx
+
+    for i in range(prev, n):
+        pos_curve[i] = size
+        equity_curve[i] = cash + size * bars[i, CLOSE]
+
+    return equity_curve, pos_curve, trade_pnl
+
+
+@njit(cache=True)
+def run_long(bars, cash0, commission):
+    """
+    Long-only state loop, ported from the next_open branch tree.
+
+    Buys all-in when the prediction turns positive and sells the whole
+    position when it turns negative, with trades executing on the open of
+    the signal bar.
+
+    Parameters:
+        - bars (float64[:, ::1]): Packed bar tensor from pack_bars.
+        - cash0 (float): Starting cash.
+        - commission (float): Commission rate per trade value.
+
+    Returns:
+        - (equity_curve, pos_curve, trade_pnl): Per-bar mark-to-market
+          equity, signed position size and realized trade PnL (nonzero on
+          the bars where a position is closed).
+    """
+    n = len(bars)
+    equity_curve = np.empty(n, dtype=np.float64)
+    pos_curve = np.empty(n, dtype=np.int64)
+    trade_pnl = np.empty(n, dtype=np.float64)
+
+    cash = cash0
+    size = 0
+    entry_price = 0.0
+
+    # One vectorized reciprocal up front turns the per-trade division into
+    # a multiply (division is several times slower than multiplication)
+    inv_open = 1.0 / bars[:, OPEN]
+
+    for i in range(n):
+        trade_pnl[i] = 0.0
+        op = bars[i, OPEN]
+        p = bars[i, PRED]
+
+        if size == 0:
+            if p > 0.0:
+                # Calculate the max number of shares ('all-in')
+                size = int(cash * inv_open[i])
+                cost = size * op
+                cash -= cost + cost * commission
+                entry_price = op
+        else:
+            if p < 0.0:
+                # Sell the whole position
+                proceeds = size * op
+                cash += proceeds - proceeds * commission
+                trade_pnl[i] = size * (op - entry_price)
+                size = 0
+
+        pos_curve[i] = size
+        equity_curve[i] = cash + size * bars[i, CLOSE]
+
+    return equity_curve, pos_curve, trade_pnl
+
+
+@njit(cache=True)
+def run_long_short(bars, cash0, commission):
+    """
+    Long/short state loop, ported from the next_open branch tree.
+
+    Goes all-in long on positive predictions and all-in short on negative
+    ones, closing and flipping the position when the prediction crosses
+    zero, with trades executing on the open of the signal bar. Flips size
+    the reopened leg from post-close cash, not the pre-fill getcash() of
+    next_open (see the module docstring).
+
+    Parameters:
+        - bars (float64[:, ::1]): Packed bar tensor from pack_bars.
+        - cash0 (float): Starting cash.
+        - commission (float): Commission rate per trade value.
+
+    Returns:
+        - (equity_curve, pos_curve, trade_pnl): Per-bar mark-to-market
+          equity, signed position size and realized trade PnL (nonzero on
+          the bars where a position is closed).
+    """
+    n = len(bars)
+    equity_curve = np.empty(n, dtype=np.float64)
+    pos_curve = np.empty(n, dtype=np.int64)
+    trade_pnl = np.empty(n, dtype=np.float64)
+
+    cash = cash0
+    size = 0
+    entry_price = 0.0
+
+    # One vectorized reciprocal up front turns the per-trade division into
+    # a multiply (division is several times slower than multiplication)
+    inv_open = 1.0 / bars[:, OPEN]
+
+    for i in range(n):
+        trade_pnl[i] = 0.0
+        op = bars[i, OPEN]
+        p = bars[i, PRED]
+
+        if size == 0:
+            if p > 0.0:
+                # Open a long position
+                size = int(cash * inv_open[i])
+                cost = size * op
+                cash -= cost + cost * commission
+                entry_price = op
+            elif p < 0.0:
+                # Open a short position
+                size = -int(cash * inv_open[i])
+                proceeds = -size * op
+                cash += proceeds - proceeds * commission
+                entry_price = op
+        elif size > 0:  # Long position
+            if p < 0.0:
+                # Close the long position and reopen short
+                proceeds = size * op
+                cash += proceeds - proceeds * commission
+                trade_pnl[i] = size * (op - entry_price)
+                size = -int(cash * inv_open[i])
+                proceeds = -size * op
+                cash += proceeds - proceeds * commission
+                entry_price = op
+        else:  # Short position
+            if p > 0.0:
+                # Close the short position and reopen long
+                cost = -size * op
+                cash -= cost + cost * commission
+                trade_pnl[i] = -size * (entry_price - op)
+                size = int(cash * inv_open[i])
+                cost = size * op
+                cash -= cost + cost * commission
+                entry_price = op
+
+        pos_curve[i] = size
+        equity_curve[i] = cash + size * bars[i, CLOSE]
+
+    return equity_curve, pos_curve, trade_pnl
+
+
+# Prefer the AOT-compiled kernels when the platform binary built by
+# build_aot.py is importable: this skips the JIT warmup on every process
+# start (one compile per worker in multiprocessing sweeps). Falls back to
+# the @njit(cache=True) definitions above otherwise.
+try:
+    from ml_strategy_kernels import (run_long, run_long_short,  # noqa: F811
+                                     run_transitions)
+except ImportError:
+    pass
@@ -0,0 +1,38 @@
+"""
+Ahead-of-time build for the strategy loop kernels.
+
+JIT warmup is paid on every process start, which adds up in short
+backtests and in multiprocessing sweeps where each worker would re-JIT.
+This script compiles the _strategy_loop kernels once at build time into a
+ml_strategy_kernels shared library; _strategy_loop imports it when the
+platform binary is present and otherwise keeps the @njit(cache=True)
+versions.
+
+Usage:
+    python build_aot.py
+"""
+
+from numba.pycc import CC
+
+import _strategy_loop
+
+cc = CC('ml_strategy_kernels')
+cc.verbose = True
+
+_RESULT = 'Tuple((f8[:], i8[:], f8[:]))'
+
+
+def _py_func(func):
+    """Unwrap an @njit-decorated function back to plain Python for pycc."""
+    return getattr(func, 'py_func', func)
+
+
+cc.export('run_long', _RESULT + '(f8[:, ::1], f8, f8)')(
+    _py_func(_strategy_loop.run_long))
+cc.export('run_long_short', _RESULT + '(f8[:, ::1], f8, f8)')(
+    _py_func(_strategy_loop.run_long_short))
+cc.export('run_transitions', _RESULT + '(i1[:], i8[:], f8[:, ::1], f8, f8)')(
+    _py_func(_strategy_loop.run_transitions))
+
+if __name__ == '__main__':
+    cc.compile()
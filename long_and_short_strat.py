@@ -1,4 +1,40 @@
+import sys
+
 import backtrader as bt
+import numpy as np
+import pandas as pd
+
+from _strategy_loop import PRED, pack_bars, run_transitions, signal_targets
+
+# Precomputed order-status bitmasks: order statuses are small integer enums,
+# so one shift + AND replaces the per-notification list allocation and linear
+# membership test in notify_order
+_EARLY_MASK = (1 << bt.Order.Submitted) | (1 << bt.Order.Accepted)
+_DONE_MASK = 1 << bt.Order.Completed
+_FAIL_MASK = ((1 << bt.Order.Canceled) | (1 << bt.Order.Margin)
+              | (1 << bt.Order.Rejected))
+
+
+def add_sign(df):
+    """
+    Quantize the predictions to a precomputed int8 'sign' column.
+
+    The strategy only ever uses the sign of the prediction, never its
+    magnitude, so streaming 8 bytes of float64 per bar through the feed is
+    8x more bandwidth than needed. Call this on the DataFrame before
+    building the data feed; MLStrategy picks the quantized line up
+    automatically when the feed carries it.
+
+    Parameters:
+        - df (pd.DataFrame): Data with a 'predicted' column.
+
+    Returns:
+        - pd.DataFrame: The same frame with a 'sign' column in {-1, 0, +1}.
+    """
+    df['sign'] = np.sign(
+        df['predicted'].to_numpy(dtype=np.float64)).astype(np.int8)
+    return df
+
 
 class MLStrategy(bt.Strategy):
     """
@@ -7,10 +43,13 @@ class MLStrategy(bt.Strategy):
     This strategy uses machine learning predictions to determine whether to enter
     a long or short position. It sells if the next day's prediction is low and
     the current position is long, or if the prediction is high and the position
-    is short.
+    is short. With allow_short=False it degrades to the long-only variant:
+    it buys on positive predictions and simply exits on negative ones.
 
     Parameters:
-        - None
+        - allow_short (bool): Take short positions on negative predictions
+          (default: True). False runs the strategy long-only.
+        - verbose (bool): Print per-bar/order log messages (default: False).
 
     Attributes:
         - data_predicted (bt.DataLine): Series of machine learning predictions.
@@ -31,7 +70,10 @@ class MLStrategy(bt.Strategy):
         Instantiate this strategy and add it to a Backtrader Cerebro engine.
     """
 
-    params = dict()
+    params = dict(
+        allow_short=True,  # False: long-only (buy on positive, exit on negative)
+        verbose=False,  # enable per-bar/order logging (slow on long backtests)
+    )
 
     def __init__(self):
         """
@@ -42,9 +84,17 @@ class MLStrategy(bt.Strategy):
         self.data_predicted = self.datas[0].predicted
         self.data_open = self.datas[0].open
         self.data_close = self.datas[0].close
+        # Branch decisions only need the prediction's sign: prefer the
+        # quantized int8 'sign' line when the feed carries one (see add_sign)
+        lines0 = self.datas[0].lines
+        self.data_sign = (lines0.sign if hasattr(lines0, 'sign')
+                          else self.data_predicted)
         self.order = None
         self.price = None
         self.comm = None
+        # ISO date strings for log(), built lazily on the first verbose
+        # call so silent runs (the default) never pay the conversion
+        self._date_strs = None
 
     def log(self, txt):
         """
@@ -53,8 +103,16 @@ class MLStrategy(bt.Strategy):
         Parameters:
             - txt (str): Message to be logged.
         """
-        dt = self.datas[0].datetime.date(0).isoformat()
-        print(f'{dt}, {txt}')
+        if not self.p.verbose:
+            return
+        if self._date_strs is None:
+            # Materialize ISO date strings once: avoids the per-call
+            # float ordinal -> datetime.date -> isoformat conversion chain
+            self._date_strs = np.array(
+                [bt.num2date(x).date().isoformat()
+                 for x in self.datas[0].datetime.array],
+                dtype=object)
+        sys.stdout.write(self._date_strs[len(self) - 1] + ', ' + txt + '\n')
 
     def notify_order(self, order):
         """
@@ -63,13 +121,26 @@ class MLStrategy(bt.Strategy):
         Parameters:
             - order (bt.Order): The order object.
         """
-        if order.status in [order.Submitted, order.Accepted]:
+        status_bit = 1 << order.status
+        if status_bit & _EARLY_MASK:
             # Order already submitted/accepted - no action required
             return
 
+        # Report executed order
+        if status_bit & _DONE_MASK:
+            if order.isbuy():
+                if self.p.verbose:
+                    self.log(f'BUY EXECUTED --- Price: {order.executed.price:.2f}, Cost: {order.executed.value:.2f}, Commission: {order.executed.comm:.2f}')
+                self.price = order.executed.price
+                self.comm = order.executed.comm
+            else:
+                if self.p.verbose:
+                    self.log(f'SELL EXECUTED --- Price: {order.executed.price:.2f}, Cost: {order.executed.value:.2f}, Commission: {order.executed.comm:.2f}')
+
         # Report failed order
-        elif order.status in [order.Canceled, order.Margin, order.Rejected]:
-            self.log('Order Failed')
+        elif status_bit & _FAIL_MASK:
+            if self.p.verbose:
+                self.log('Order Failed')
 
         # Set no pending order
         self.order = None
@@ -83,7 +154,8 @@ class MLStrategy(bt.Strategy):
         """
         if not trade.isclosed:
             return
-        self.log(f'OPERATION RESULT --- Gross: {trade.pnl:.2f}, Net: {trade.pnlcomm:.2f}')
+        if self.p.verbose:
+            self.log(f'OPERATION RESULT --- Gross: {trade.pnl:.2f}, Net: {trade.pnlcomm:.2f}')
 
     def next_open(self):
         """
@@ -92,29 +164,127 @@ class MLStrategy(bt.Strategy):
         Determines whether to enter a long or short position based on machine
         learning predictions and closes positions if necessary.
         """
+        # Bind hot attribute chains to locals once per bar
+        open0 = self.data_open[0]
+        pred = self.data_sign[0]
+        cash = self.broker.getcash()
+        pos_size = self.position.size if self.position else 0
+        verbose = self.p.verbose
+
         # Calculate the max number of shares ('all-in')
-        size = int(self.broker.getcash() / self.datas[0].open)
-            
-        if not self.position:
-            if self.data_predicted > 0:
+        size = int(cash / open0)
+
+        if pos_size == 0:
+            if pred > 0.0:
                 # Buy order
-                self.log(f'LONG CREATED --- Size: {size}, Cash: {self.broker.getcash():.2f}, Open: {self.data_open[0]}, Close: {self.data_close[0]}')
+                if verbose:
+                    self.log(f'LONG CREATED --- Size: {size}, Cash: {cash:.2f}, Open: {open0}, Close: {self.data_close[0]}')
                 self.buy(size=size)
-            elif self.data_predicted < 0:
+            elif pred < 0.0 and self.p.allow_short:
                 # Sell short order
-                self.log(f'SHORT CREATED --- Size: {size}, Cash: {self.broker.getcash():.2f}, Open: {self.data_open[0]}, Close: {self.data_close[0]}')
-                self.sell(size=size)   
+                if verbose:
+                    self.log(f'SHORT CREATED --- Size: {size}, Cash: {cash:.2f}, Open: {open0}, Close: {self.data_close[0]}')
+                self.sell(size=size)
         else:
-            if self.position.size > 0:  # Long position
-                if self.data_predicted < 0:
-                    # Close the long position
-                    self.log(f'CLOSE LONG POSITION --- Size: {self.position.size}')
-                    self.close()
-                    self.sell(size=size)   
+            if pos_size > 0:  # Long position
+                if pred < 0.0:
+                    if self.p.allow_short:
+                        # Flip long -> short with a single order instead of
+                        # a close + sell pair
+                        if verbose:
+                            self.log(f'FLIP TO SHORT --- Size: {pos_size} -> {-size}')
+                        self.order_target_size(target=-size)
+                    else:
+                        # Sell order (long-only: just exit)
+                        if verbose:
+                            self.log(f'SELL CREATED --- Size: {pos_size}')
+                        self.sell(size=pos_size)
 
-            elif self.position.size < 0:  # Short position
-                if self.data_predicted > 0:
-                    # Close the short position
-                    self.log(f'CLOSE SHORT POSITION --- Size: {abs(self.position.size)}')
+            elif pos_size < 0:  # Short position
+                if pred > 0.0:
+                    # Close the short position, then reopen long. This must
+                    # stay a two-order pair: while short, getcash() is
+                    # inflated by the short-sale proceeds, so a single
+                    # merged buy of size + |pos_size| shares would be
+                    # margin-rejected atomically and the account would stay
+                    # short. The close always executes; only the oversized
+                    # re-open can be rejected.
+                    if verbose:
+                        self.log(f'CLOSE SHORT POSITION --- Size: {-pos_size}')
                     self.close()
                     self.buy(size=size)
+
+    @classmethod
+    def run_vectorized(cls, df, cash=100000.0, allow_short=True):
+        """
+        Run the strategy as a single vectorized pass over the data.
+
+        Instead of dispatching into next_open once per bar, the full signal,
+        position and equity curves are computed with NumPy array operations.
+        Trades are assumed to execute on the open of the bar whose prediction
+        changed sign, matching the cheat-on-open behaviour of next_open.
+
+        Parameters:
+            - df (pd.DataFrame): Data with 'predicted', 'open' and 'close' columns.
+            - cash (float): Starting cash.
+            - allow_short (bool): Take short positions on negative predictions.
+
+        Returns:
+            - pd.DataFrame: Per-bar 'position', 'equity' and 'event' columns,
+              where 'event' is nonzero on the bars where a trade occurs.
+        """
+        open_ = df['open'].to_numpy(dtype=np.float64)
+        close = df['close'].to_numpy(dtype=np.float64)
+
+        # Long on positive predictions, short on negative ones;
+        # signal_targets forward-fills zero predictions so the current
+        # position is held, exactly as next_open does
+        target, _ = signal_targets(
+            df['predicted'].to_numpy(dtype=np.float64), allow_short=allow_short)
+        position = target.astype(np.float64)
+
+        # Trade events are the transitions of the position curve
+        events = np.diff(position, prepend=0.0)
+
+        # Per-bar gross return: the old position is carried from the previous
+        # close to this open, the new position from this open to this close
+        prev_close = np.concatenate(([open_[0]], close[:-1]))
+        prev_position = np.concatenate(([0.0], position[:-1]))
+        gross = ((1.0 + prev_position * (open_ / prev_close - 1.0))
+                 * (1.0 + position * (close / open_ - 1.0)))
+        equity = cash * np.cumprod(gross)
+
+        return pd.DataFrame(
+            {'position': position, 'equity': equity, 'event': events},
+            index=df.index)
+
+    @classmethod
+    def run_compiled(cls, df, cash=100000.0, commission=0.001, allow_short=True):
+        """
+        Run the strategy through the Numba-compiled state loop.
+
+        Unlike run_vectorized this keeps path-dependent all-in share
+        sizing (each trade size depends on the cash left by the previous
+        trade), but executes it as compiled machine code instead of
+        per-bar Python dispatch. Note that on long<->short flips the
+        kernels size the reopened leg from post-close cash rather than
+        the pre-fill getcash() of next_open, so equity curves diverge
+        from a Cerebro run on any flip (see _strategy_loop).
+
+        Parameters:
+            - df (pd.DataFrame): Data with 'predicted', 'open' and 'close' columns.
+            - cash (float): Starting cash.
+            - commission (float): Commission rate per trade value.
+            - allow_short (bool): Take short positions on negative predictions.
+
+        Returns:
+            - pd.DataFrame: Per-bar 'equity', 'position' and 'trade_pnl' columns.
+        """
+        bars = pack_bars(df)
+        target, transitions = signal_targets(
+            bars[:, PRED], allow_short=allow_short)
+        equity, position, trade_pnl = run_transitions(
+            target, transitions, bars, cash, commission)
+        return pd.DataFrame(
+            {'equity': equity, 'position': position, 'trade_pnl': trade_pnl},
+            index=df.index)
@@ -0,0 +1,113 @@
+"""
+Parallel backtest driver for parameter/instrument sweeps.
+
+A single MLStrategy run is inherently sequential (the cash curve is
+path-dependent), but sweeps across instruments or strategy parameters are
+embarrassingly parallel. This module wraps one full Cerebro run in a
+top-level picklable function and fans jobs out over a process pool,
+sidestepping the GIL and using all cores. Workers load their DataFrame
+from a pickle path instead of receiving it over IPC, so large frames are
+never serialized between processes.
+
+Usage:
+    jobs = [('data/aapl.pkl', {}), ('data/msft.pkl', {'verbose': False})]
+    results = run_sweep(jobs)
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import backtrader as bt
+import pandas as pd
+
+from long_and_short_strat import MLStrategy
+
+
+class SignalData(bt.feeds.PandasData):
+    """
+    PandasData feed carrying the machine learning prediction line.
+
+    Expects a DataFrame with the standard OHLCV columns plus a 'predicted'
+    column holding the model output for each bar.
+    """
+    lines = ('predicted',)
+    params = (('predicted', -1),)
+
+
+class QuantizedSignalData(SignalData):
+    """
+    SignalData plus the quantized int8 'sign' line.
+
+    Use with DataFrames preprocessed by long_and_short_strat.add_sign so
+    the strategy branches on the 1-byte sign stream instead of the full
+    float64 predictions.
+    """
+    lines = ('sign',)
+    params = (('sign', -1),)
+
+
+def run_backtest(pkl_path, strategy_params=None, strategy=MLStrategy,
+                 cash=100000.0, commission=0.001):
+    """
+    Run a single backtest and return a small dict of summary metrics.
+
+    Designed to be called from worker processes: everything passed in is
+    cheap to pickle, and the DataFrame is loaded from disk inside the
+    worker rather than shipped across the process boundary. Frames
+    preprocessed with long_and_short_strat.add_sign (a 'sign' column)
+    are fed through QuantizedSignalData automatically.
+
+    Parameters:
+        - pkl_path (str): Path to a pickled DataFrame with OHLCV and
+          'predicted' columns.
+        - strategy_params (dict): Keyword parameters for the strategy.
+        - strategy (bt.Strategy): Strategy class to backtest.
+        - cash (float): Starting cash.
+        - commission (float): Commission rate per trade value.
+
+    Returns:
+        - dict: pkl_path, strategy parameters, start/final portfolio
+          values and the total return in percent.
+    """
+    df = pd.read_pickle(pkl_path)
+
+    cerebro = bt.Cerebro(stdstats=False, cheat_on_open=True)
+    # Prefer the quantized feed when the frame carries the 'sign' column
+    feed_cls = QuantizedSignalData if 'sign' in df.columns else SignalData
+    cerebro.adddata(feed_cls(dataname=df))
+    cerebro.addstrategy(strategy, **(strategy_params or {}))
+    cerebro.broker.setcash(cash)
+    cerebro.broker.setcommission(commission=commission)
+
+    start_value = cerebro.broker.getvalue()
+    cerebro.run()
+    final_value = cerebro.broker.getvalue()
+
+    return {
+        'pkl_path': pkl_path,
+        'params': dict(strategy_params or {}),
+        'start_value': start_value,
+        'final_value': final_value,
+        'return_pct': 100.0 * (final_value - start_value) / start_value,
+    }
+
+
+def run_sweep(jobs, max_workers=None, timeout=None):
+    """
+    Run a sweep of backtests across a process pool.
+
+    Parameters:
+        - jobs (iterable): (pkl_path, strategy_params) pairs, one per run.
+        - max_workers (int): Pool size (default: os.cpu_count()).
+        - timeout (float): Per-run timeout in seconds for stuck workers.
+
+    Returns:
+        - list[dict]: run_backtest metrics, in job order.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count()
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run_backtest, pkl_path, strategy_params)
+                   for pkl_path, strategy_params in jobs]
+        return [future.result(timeout=timeout) for future in futures]